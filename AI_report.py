@@ -7,14 +7,42 @@ try:
 except ImportError:
     OpenAI = None
 
+# Optional faster JSON serializer
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def _json_safe(obj):
-    # Convert datetime and other non-JSON types into safe string form
+    # Convert datetime and other non-JSON types into safe string form.
+    # NumPy scalars/arrays become native values, as orjson emits them.
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
     if hasattr(obj, "isoformat"):
         return obj.isoformat()
     return str(obj)
 
 
+def _dumps(obj):
+    # Pretty-print session data for the prompt, preferring orjson.
+    # orjson still rejects ints wider than 64 bits, so fall back to json.
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                obj,
+                default=_json_safe,
+                option=(
+                    orjson.OPT_INDENT_2
+                    | orjson.OPT_SERIALIZE_NUMPY
+                    | orjson.OPT_NON_STR_KEYS
+                )
+            ).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=_json_safe)
+
+
 class AIForensicReporter:
     """
     Optional AI-assisted forensic reporting component.
@@ -48,7 +76,7 @@ Rules:
 - Base your explanation strictly on timestamps and events provided.
 
 SESSION SUMMARY:
-{json.dumps(session_summary, indent=2, default=_json_safe)}
+{_dumps(session_summary)}
 
 Your response must include:
 - Attack narrative (chronological sequence)
@@ -1,6 +1,16 @@
 import os
 
 
+# Log key -> human-readable name used in validation messages
+LOG_NAMES = {
+    "security": "Security",
+    "ts": "Terminal Services (RemoteConnectionManager)",
+    "lsm": "Local Session Manager",
+    "system": "System",
+    "tasks": "Task Scheduler"
+}
+
+
 class LogLoader:
     def __init__(self, security=None, ts=None, lsm=None, system=None, tasks=None):
         """
@@ -23,15 +33,15 @@ class LogLoader:
         # Allow missing logs (not all investigations have every log)
         if path is None:
             return None
-        
+
         # Ensure the file actually exists on disk
         if not os.path.exists(path):
             raise FileNotFoundError(f"[ERROR] {name} log not found at: {path}")
-        
+
         # Basic sanity check to ensure EVTX format
         if not path.lower().endswith(".evtx"):
             raise ValueError(f"[ERROR] {name} must be an .evtx file")
-        
+
         # Informational message for the user / CLI
         print(f"[OK] {name} log found → {path}")
 
@@ -44,28 +54,15 @@ class LogLoader:
         Ensures at least one EVTX file is supplied.
         """
 
-        # Validate each log independently
-        security = self.validate_file(self.security, "Security")
-        ts = self.validate_file(self.ts, "Terminal Services (RemoteConnectionManager)")
-        lsm = self.validate_file(self.lsm, "Local Session Manager")
-        system = self.validate_file(self.system, "System")
-        tasks = self.validate_file(self.tasks, "Task Scheduler")
+        # Validate each log independently in a single pass
+        logs = {
+            key: self.validate_file(getattr(self, key), name)
+            for key, name in LOG_NAMES.items()
+        }
 
         # Prevent running the pipeline with zero evidence
-        if (
-            security is None
-            and ts is None
-            and lsm is None
-            and system is None
-            and tasks is None
-        ):
+        if all(path is None for path in logs.values()):
             raise ValueError("No logs provided. At least one EVTX file is required.")
 
         # Return validated paths for downstream parsing
-        return {
-            "security": security,
-            "ts": ts,
-            "lsm": lsm,
-            "system": system,
-            "tasks": tasks
-        }
+        return logs
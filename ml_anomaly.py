@@ -1,6 +1,64 @@
 import numpy as np
-from sklearn.neighbors import LocalOutlierFactor
 
+# sklearnex patch names for LOF across releases (newest first)
+SKLEARNEX_LOF_PATCHES = (
+    "sklearn.neighbors.LocalOutlierFactor",
+    "localoutlierfactor",
+    "lof"
+)
+
+
+def _enable_sklearnex():
+    """
+    Route LOF to Intel oneDAL when scikit-learn-intelex is installed.
+    Called lazily before LOF is imported, so plain CLI runs never pay
+    for (or fail on) the patch.
+    """
+    try:
+        from sklearnex import patch_sklearn
+    except ImportError:
+        return
+
+    for name in SKLEARNEX_LOF_PATCHES:
+        try:
+            patch_sklearn(name)
+            return
+        except ValueError:
+            # Patch name not known to this sklearnex release
+            continue
+
+# Between these session counts, LOF neighborhoods are too sparse to be
+# meaningful and a per-feature z-score detector is used instead. With
+# n samples |z| cannot exceed sqrt(n - 1), so below 11 sessions the
+# z-score threshold is unreachable and LOF is kept.
+ZSCORE_MIN_SESSIONS = 11
+LOF_MIN_SESSIONS = 30
+
+# |z| an explainable feature must exceed to flag a small-sample session
+ZSCORE_THRESHOLD = 3.0
+
+# LOF neighborhood size, shared by the PyOD and scikit-learn backends
+LOF_NEIGHBORS = 35
+
+# Neighborhood size for very small session sets (original LOF setting)
+SMALL_LOF_NEIGHBORS = 3
+
+# LOF score above which a session is an outlier (scikit-learn's
+# contamination="auto" cut-off, applied to both backends)
+LOF_THRESHOLD = 1.5
+
+# Feature name -> analyst-facing explanation when its z-score is extreme
+FEATURE_REASONS = {
+    "duration": "Unusual session duration",
+    "unique_tasks": "Unusual scheduled task activity",
+    "unique_services": "Service installation behavior",
+    "admin_added": "Privilege escalation activity",
+    "user_created": "User account creation",
+    "logs_cleared": "Anti-forensics behavior",
+    "failed_logons": "Failed login anomaly",
+    "off_hours": "Off-hours access pattern",
+    "total_events": "High session activity volume"
+}
 
 class MLAnomalyDetector:
     """
@@ -8,6 +66,20 @@ class MLAnomalyDetector:
     Intended as supporting analysis, not primary evidence.
     """
 
+    # Event ID -> feature handler; unlisted IDs are skipped outright
+    _EID_HANDLERS = {
+        "4625": ("count", "failed"),
+        "4624": ("count", "success"),
+        "1149": ("count", "success"),
+        "4698": ("task",),
+        "129": ("task",),
+        "7045": ("service",),
+        "4732": ("count", "admin_add"),
+        "4720": ("count", "user_create"),
+        "1102": ("count", "logs_cleared")
+    }
+
+
     def __init__(self, sessions):
         self.sessions = sessions
         self.results = []
@@ -28,48 +100,39 @@ class MLAnomalyDetector:
             "user_present"
         ]
 
+        # Scratch sets reused across sessions; only their sizes are features
+        self._seen_tasks = set()
+        self._seen_services = set()
 
-    def _extract_features(self, session):
-        """Extract session-level behavioral features (no time logic)."""
 
-        events = session.get("events", [])
+    def _task_name(self, details):
+        """Best-effort scheduled task name."""
+        return (
+            details.get("TaskName")
+            or details.get("Task")
+            or details.get("Name")
+            or "UnknownTask"
+        )
+
+
+    def _service_name(self, details):
+        """Best-effort installed service name."""
+        return (
+            details.get("ServiceName")
+            or details.get("Service")
+            or "UnknownService"
+        )
+
+
+    def _session_context(self, session):
+        """Per-session features that do not depend on individual events."""
 
         # Session duration in seconds
         duration = 0
         if session.get("start_time") and session.get("end_time"):
             duration = (session["end_time"] - session["start_time"]).total_seconds()
 
-        # Authentication-related activity
-        failed = sum(1 for e in events if e["event_id"] == "4625")
-        success = sum(1 for e in events if e["event_id"] in ("4624", "1149"))
-
-        # Deduplicated persistence mechanisms
-        unique_tasks = set()
-        unique_services = set()
-
-        for e in events:
-            if e["event_id"] in ("4698", "129"):
-                name = (
-                    e["details"].get("TaskName")
-                    or e["details"].get("Task")
-                    or e["details"].get("Name")
-                    or "UnknownTask"
-                )
-                unique_tasks.add(name)
-
-            elif e["event_id"] == "7045":
-                svc = (
-                    e["details"].get("ServiceName")
-                    or e["details"].get("Service")
-                    or "UnknownService"
-                )
-                unique_services.add(svc)
-
-        admin_add = sum(1 for e in events if e["event_id"] == "4732")
-        user_create = sum(1 for e in events if e["event_id"] == "4720")
-        logs_cleared = sum(1 for e in events if e["event_id"] == "1102")
-
-        total_events = len(events)
+        total_events = len(session.get("events", []))
 
         # Coarse temporal context (label only, not correlation)
         off_hours = 0
@@ -82,83 +145,154 @@ class MLAnomalyDetector:
         ip_present = 1 if session.get("source_ip") else 0
         user_present = 1 if session.get("user") else 0
 
-        return [
-            duration,
-            failed,
-            success,
-            len(unique_tasks),
-            len(unique_services),
-            admin_add,
-            user_create,
-            logs_cleared,
-            total_events,
-            off_hours,
-            ip_present,
-            user_present
-        ]
+        return duration, total_events, off_hours, ip_present, user_present
 
 
-    def run(self):
+    def _extract_features(self, session, out_row):
+        """Write session-level behavioral features into out_row (no time logic)."""
+
+        events = session.get("events", [])
+
+        # Single pass: dispatch each event ID through the handler table,
+        # counting activity and collecting deduplicated persistence
+        counts = {
+            "failed": 0,
+            "success": 0,
+            "admin_add": 0,
+            "user_create": 0,
+            "logs_cleared": 0
+        }
+        unique_tasks = self._seen_tasks
+        unique_services = self._seen_services
+        unique_tasks.clear()
+        unique_services.clear()
+
+        for e in events:
+            handler = self._EID_HANDLERS.get(e["event_id"])
+            if handler is None:
+                continue
+
+            kind = handler[0]
+
+            if kind == "count":
+                counts[handler[1]] += 1
+            elif kind == "task":
+                unique_tasks.add(self._task_name(e["details"]))
+            else:
+                unique_services.add(self._service_name(e["details"]))
+
+        duration, total_events, off_hours, ip_present, user_present = (
+            self._session_context(session)
+        )
+
+        out_row[0] = duration
+        out_row[1] = counts["failed"]
+        out_row[2] = counts["success"]
+        out_row[3] = len(unique_tasks)
+        out_row[4] = len(unique_services)
+        out_row[5] = counts["admin_add"]
+        out_row[6] = counts["user_create"]
+        out_row[7] = counts["logs_cleared"]
+        out_row[8] = total_events
+        out_row[9] = off_hours
+        out_row[10] = ip_present
+        out_row[11] = user_present
+
+
+    def _zscore_detect(self, Z):
         """
-        Run unsupervised anomaly detection across sessions.
-        Skips execution when session count is too small.
+        Flag sessions with an extreme z-score on any explainable feature.
+        Only used from ZSCORE_MIN_SESSIONS up, where |z| > 3 is reachable.
         """
+        cols = [i for i, f in enumerate(self.feature_names) if f in FEATURE_REASONS]
+        abs_z = np.abs(Z[:, cols])
+
+        preds = np.where((abs_z > ZSCORE_THRESHOLD).any(axis=1), -1, 1)
+        scores = -abs_z.max(axis=1)
+        return preds, scores
 
-        # LOF is unreliable with very small samples
-        if not self.sessions or len(self.sessions) < 5:
-            print("[+] ML anomaly detection skipped (insufficient sessions)")
-            return []
 
-        X = []
-        session_map = []
+    def _lof_detect(self, X, n_neighbors):
+        """Neighborhood-based LOF; returns sklearn-style (preds, scores)."""
 
-        for s in self.sessions:
-            X.append(self._extract_features(s))
-            session_map.append(s)
+        n_neighbors = min(n_neighbors, len(X) - 1)
 
-        X = np.array(X)
+        # Patch before importing so LOF resolves to the oneDAL version
+        _enable_sklearnex()
+
+        # Optional PyOD LOF, imported only when ML actually runs
+        try:
+            from pyod.models.lof import LOF as PyODLOF
+        except ImportError:
+            PyODLOF = None
+
+        if PyODLOF is not None:
+            clf = PyODLOF(n_neighbors=n_neighbors)
+            clf.fit(X)
+
+            # decision_scores_ is the raw LOF; ignore PyOD's fixed 10%
+            # contamination labels and use the same cut-off as sklearn
+            lof_scores = clf.decision_scores_
+            preds = np.where(lof_scores > LOF_THRESHOLD, -1, 1)
+            return preds, -lof_scores
+
+        from sklearn.neighbors import LocalOutlierFactor
 
         lof = LocalOutlierFactor(
-            n_neighbors=min(3, len(X) - 1),
+            n_neighbors=n_neighbors,
             contamination="auto"
         )
 
         preds = lof.fit_predict(X)
         scores = lof.negative_outlier_factor_
+        return preds, scores
+
+
+    def run(self):
+        """
+        Run unsupervised anomaly detection across sessions.
+        Skips execution when session count is too small.
+        """
+
+        # Statistics are meaningless with very small samples
+        if not self.sessions or len(self.sessions) < 5:
+            print("[+] ML anomaly detection skipped (insufficient sessions)")
+            return []
+
+        # Fill a preallocated feature matrix row by row
+        n = len(self.sessions)
+        X = np.empty((n, len(self.feature_names)), dtype=np.float64)
+        session_map = self.sessions
+
+        for i, s in enumerate(self.sessions):
+            self._extract_features(s, X[i])
 
         means = np.mean(X, axis=0)
         stds = np.std(X, axis=0) + 1e-9
 
-        for idx, (sess, pred, score, vec) in enumerate(zip(session_map, preds, scores, X)):
-            if pred != -1:
-                continue
+        # Z-scores for all sessions at once: the small-sample detector
+        # and the per-outlier explanations both read from this matrix
+        Z = (X - means) / stds
+
+        if n < ZSCORE_MIN_SESSIONS:
+            preds, scores = self._lof_detect(X, SMALL_LOF_NEIGHBORS)
+        elif n < LOF_MIN_SESSIONS:
+            preds, scores = self._zscore_detect(Z)
+        else:
+            preds, scores = self._lof_detect(X, LOF_NEIGHBORS)
+
+        outlier_idx = np.where(preds == -1)[0]
+        flagged = np.abs(Z[outlier_idx]) >= 1.5
 
-            # Z-score explanation for interpretability
-            z = (vec - means) / stds
+        for row, idx in enumerate(outlier_idx.tolist()):
+            sess = session_map[idx]
+            score = scores[idx]
             reasons = []
 
-            for fname, zscore in zip(self.feature_names, z):
-                if abs(zscore) < 1.5:
-                    continue
-
-                if fname == "duration":
-                    reasons.append("Unusual session duration")
-                elif fname == "unique_tasks":
-                    reasons.append("Unusual scheduled task activity")
-                elif fname == "unique_services":
-                    reasons.append("Service installation behavior")
-                elif fname == "admin_added":
-                    reasons.append("Privilege escalation activity")
-                elif fname == "user_created":
-                    reasons.append("User account creation")
-                elif fname == "logs_cleared":
-                    reasons.append("Anti-forensics behavior")
-                elif fname == "failed_logons":
-                    reasons.append("Failed login anomaly")
-                elif fname == "off_hours":
-                    reasons.append("Off-hours access pattern")
-                elif fname == "total_events":
-                    reasons.append("High session activity volume")
+            for col in np.where(flagged[row])[0]:
+                reason = FEATURE_REASONS.get(self.feature_names[col])
+                if reason:
+                    reasons.append(reason)
 
             if not reasons:
                 reasons.append("Statistically anomalous session behavior")
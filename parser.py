@@ -1,10 +1,34 @@
-from Evtx.Evtx import Evtx
 import xml.etree.ElementTree as ET
-import datetime
+import json
+import io
+import re
+import sys
+
+# Prefer the Rust-backed pyevtx-rs parser (emits JSON, no XML round-trip)
+try:
+    from evtx import PyEvtxParser
+except ImportError:
+    PyEvtxParser = None
+
+# Fall back to python-evtx when pyevtx-rs is unavailable
+if PyEvtxParser is None:
+    from Evtx.Evtx import Evtx
 
 # XML namespace used by Windows Event Logs
 NS = "{http://schemas.microsoft.com/win/2004/08/events/event}"
 
+# Namespaced tags, built once instead of per record
+SYSTEM_TAG = f"{NS}System"
+EID_TAG = f"{NS}EventID"
+TIME_TAG = f"{NS}TimeCreated"
+EDATA_TAG = f"{NS}EventData"
+UDATA_TAG = f"{NS}UserData"
+DATA_TAG = f"{NS}Data"
+
+# Cheap EventID peeks used to drop irrelevant records before full parsing
+JSON_EID_RE = re.compile(r'"EventID":\s*(?:\{.*?"#text":\s*)?"?(\d+)', re.DOTALL)
+XML_EID_RE = re.compile(r"<EventID[^>]*>\s*(\d+)\s*</EventID>")
+
 
 # RDP + DFIR relevant event IDs only
 # Parser extracts evidence, not detections
@@ -37,92 +61,192 @@ RDP_RELEVANT_EVENTS = {
 
 class RDPEventParser:
 
-    def __init__(self):
-        self.events = []  # Collected parsed events
-
-
-    def _convert_time(self, ts):
-        """Convert ISO timestamp string to datetime object."""
-        if not ts or ts == "N/A":
-            return None
-
-        try:
-            # Converts e.g. 2026-01-01T00:11:56.007219Z
-            return datetime.datetime.fromisoformat(ts.replace("Z", "+00:00"))
-        except:
-            # Invalid or malformed timestamps are ignored
-            return None
-
+    def __init__(self, verbose=True):
+        self.verbose = verbose  # Progress messages (disable for batch runs)
+
+
+    def _new_event(self, event_id, timestamp, source_name):
+        """Build the core event structure shared by both parser backends."""
+        return {
+            "event_id": event_id,
+            "event_name": RDP_RELEVANT_EVENTS[event_id],
+            "timestamp": timestamp,                    # raw evidence, parsed by the timeline
+            "source": source_name,
+            "details": {}
+        }
+
+
+    def _flatten_json(self, node, details):
+        """Copy leaf values of a JSON EventData/UserData node into details."""
+        for key, value in node.items():
+            if key == "#attributes":
+                continue
+
+            if isinstance(value, dict) and "#text" in value:
+                # Element carrying both attributes and text
+                value = value["#text"]
+
+            if isinstance(value, dict):
+                self._flatten_json(value, details)
+            elif isinstance(value, list):
+                # Unnamed <Data> elements are emitted as a list of values
+                for i, item in enumerate(value):
+                    if not isinstance(item, dict):
+                        details[sys.intern(f"{key}{i}")] = None if item is None else str(item)
+            else:
+                details[sys.intern(key)] = None if value is None else str(value)
+
+
+    def _iter_json(self, path, source_name):
+        """Yield relevant events using pyevtx-rs JSON records."""
+        parser = PyEvtxParser(path)
+
+        for record in parser.records_json():
+            data = record["data"]
+
+            # Skip irrelevant records without decoding the JSON
+            match = JSON_EID_RE.search(data)
+            if match and match.group(1) not in RDP_RELEVANT_EVENTS:
+                continue
+
+            # Decode JSON record
+            try:
+                root = json.loads(data)["Event"]
+                system = root["System"]
+            except (ValueError, KeyError, TypeError):
+                # Skip malformed records
+                continue
+
+            # Extract Event ID (scalar, or {"#text": ...} when qualified)
+            eid_node = system.get("EventID")
+            if isinstance(eid_node, dict):
+                eid_node = eid_node.get("#text")
+            if eid_node is None:
+                continue
+
+            # Interned: millions of events share a handful of ID strings
+            event_id = sys.intern(str(eid_node).strip())
+
+            # Ignore irrelevant events early
+            if event_id not in RDP_RELEVANT_EVENTS:
+                continue
+
+            # Extract timestamp from SystemTime attribute
+            time_node = system.get("TimeCreated") or {}
+            timestamp = time_node.get("#attributes", {}).get("SystemTime", "N/A")
+
+            event = self._new_event(event_id, timestamp, source_name)
+
+            # Extract EventData fields (Security / System / RDP logs)
+            event_data = root.get("EventData")
+            if isinstance(event_data, dict):
+                self._flatten_json(event_data, event["details"])
+
+            # Extract UserData fields (TaskScheduler and others)
+            user_data = root.get("UserData")
+            if isinstance(user_data, dict):
+                self._flatten_json(user_data, event["details"])
+
+            yield event
+
+
+    def _iter_xml(self, path, source_name):
+        """Yield relevant events using python-evtx XML records (fallback)."""
+        with Evtx(path) as log:
+            for record in log.records():
 
-    def parse_evtx(self, path, source_name):
-        """Parse an EVTX file and extract relevant DFIR events."""
-        print(f"[+] Parsing {source_name}: {path}")
+                event_id = None
+                timestamp = "N/A"
+                details = {}
+                unnamed = []
 
-        count = 0
+                xml = record.xml()
 
-        with Evtx(path) as log:
-            for record in log.records():
+                # Skip irrelevant records without parsing the XML
+                match = XML_EID_RE.search(xml)
+                if match and match.group(1) not in RDP_RELEVANT_EVENTS:
+                    continue
 
-                # Parse XML record
+                # Stream the record XML instead of building a full DOM
                 try:
-                    root = ET.fromstring(record.xml())
-                except:
+                    buf = io.BytesIO(xml.encode("utf-8"))
+
+                    for _, elem in ET.iterparse(buf, events=("end",)):
+                        tag = elem.tag
+
+                        # Extract Event ID
+                        if tag == EID_TAG:
+                            event_id = sys.intern((elem.text or "").strip())
+
+                            # System precedes EventData/UserData, so stop
+                            # parsing irrelevant records right here
+                            if event_id not in RDP_RELEVANT_EVENTS:
+                                break
+
+                        # Extract timestamp from SystemTime attribute
+                        elif tag == TIME_TAG:
+                            timestamp = elem.attrib.get("SystemTime", "N/A")
+
+                        # Extract EventData fields (Security / System / RDP logs)
+                        elif tag == DATA_TAG:
+                            name = elem.attrib.get("Name")
+                            if name:
+                                details[sys.intern(name)] = elem.text
+                            else:
+                                unnamed.append(elem.text)
+
+                        # Extract UserData leaf fields (TaskScheduler and others),
+                        # dropping any {namespace} prefix to match the JSON backend
+                        elif tag == UDATA_TAG:
+                            for child in elem.iter():
+                                if len(child) == 0 and child is not elem:
+                                    name = child.tag.rpartition("}")[2]
+                                    details[sys.intern(name)] = child.text
+                            elem.clear()
+
+                        elif tag in (EDATA_TAG, SYSTEM_TAG):
+                            elem.clear()
+
+                except ET.ParseError:
                     # Skip malformed XML records
                     continue
 
-                system = root.find(f"{NS}System")
-                if system is None:
+                # Ignore irrelevant events (or records without an Event ID)
+                if event_id not in RDP_RELEVANT_EVENTS:
                     continue
 
-                # Extract Event ID
-                eid_node = system.find(f"{NS}EventID")
-                if eid_node is None:
-                    continue
+                # Unnamed <Data> values, keyed as the JSON backend keys them
+                if len(unnamed) == 1:
+                    details["Data"] = unnamed[0]
+                else:
+                    for i, text in enumerate(unnamed):
+                        details[sys.intern(f"Data{i}")] = text
 
-                event_id = eid_node.text.strip()
+                event = self._new_event(event_id, timestamp, source_name)
+                event["details"] = details
 
-                # Ignore irrelevant events early
-                if event_id not in RDP_RELEVANT_EVENTS:
-                    continue
+                yield event
+
+
+    def iter_events(self, path, source_name):
+        """
+        Parse an EVTX file and yield relevant DFIR events in file order.
+        Events are streamed so no per-file list is ever held in memory.
+        """
+        if self.verbose:
+            print(f"[+] Parsing {source_name}: {path}")
+
+        source_name = sys.intern(source_name)
+
+        if PyEvtxParser is not None:
+            records = self._iter_json(path, source_name)
+        else:
+            records = self._iter_xml(path, source_name)
+
+        count = 0
+        for event in records:
+            count += 1
+            yield event
 
-                # Extract timestamp from SystemTime attribute
-                time_node = system.find(f"{NS}TimeCreated")
-                timestamp = (
-                    time_node.attrib.get("SystemTime")
-                    if time_node is not None else "N/A"
-                )
-
-                # Core event structure
-                event = {
-                    "event_id": event_id,
-                    "event_name": RDP_RELEVANT_EVENTS[event_id],
-                    "timestamp": timestamp,                    # raw evidence
-                    "parsed_time": self._convert_time(timestamp),  # analysis-friendly
-                    "source": source_name,
-                    "details": {}
-                }
-
-                # Extract EventData fields (Security / System / RDP logs)
-                event_data = root.find(f"{NS}EventData")
-                if event_data is not None:
-                    for d in event_data:
-                        name = d.attrib.get("Name", "")
-                        event["details"][name] = d.text
-
-                # Extract UserData fields (TaskScheduler and others)
-                user_data = root.find(f"{NS}UserData")
-                if user_data is not None:
-                    for elem in user_data.iter():
-                        if elem.text and elem.tag:
-                            clean_name = elem.tag.replace(NS, "")
-                            event["details"][clean_name] = elem.text
-
-                self.events.append(event)
-                count += 1
-
-        print(f"[OK] Extracted {count} relevant events from {source_name}")
-
-
-    def get_events(self):
-        """Return all parsed events."""
-        return self.events
+        if self.verbose:
+            print(f"[OK] Extracted {count} relevant events from {source_name}")
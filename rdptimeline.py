@@ -1,5 +1,7 @@
 import argparse
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 
 # Core pipeline components
 from loader import LogLoader
@@ -10,6 +12,29 @@ from ml_anomaly import MLAnomalyDetector
 from AI_report import AIForensicReporter
 
 
+# Log key -> source name used in parsed events
+LOG_SOURCES = [
+    ("security", "Security"),
+    ("ts", "RemoteConnectionManager"),
+    ("lsm", "LocalSessionManager"),
+    ("system", "System"),             # persistence (service installs)
+    ("tasks", "TaskScheduler")        # persistence (scheduled tasks)
+]
+
+
+def _parse_one(path, source_name, verbose=True):
+    """Parse a single EVTX file in a worker process (must be picklable)."""
+    return list(RDPEventParser(verbose=verbose).iter_events(path, source_name))
+
+
+def _reintern(events):
+    """Restore interning of shared strings lost when pickling worker results."""
+    for ev in events:
+        ev["event_id"] = sys.intern(ev["event_id"])
+        ev["source"] = sys.intern(ev["source"])
+    return events
+
+
 def main():
     # CLI argument parser for DFIR workflow
     parser = argparse.ArgumentParser(
@@ -37,7 +62,15 @@ def main():
         help="Enable optional AI-assisted forensic reporting"
     )
 
+    # Suppress per-file / per-stage progress messages (batch mode)
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Suppress parsing and timeline progress messages"
+    )
+
     args = parser.parse_args()
+    verbose = not args.quiet
 
     print("\n[+] Initializing Log Loader...\n")
 
@@ -55,35 +88,30 @@ def main():
 
     # Parse EVTX logs into normalized event structures
     print("\n[+] Starting EVTX Parsing...\n")
-    parser_engine = RDPEventParser()
+    jobs = [(logs[key], name) for key, name in LOG_SOURCES if logs.get(key)]
 
-    if logs.get("security"):
-        parser_engine.parse_evtx(logs["security"], "Security")
-
-    if logs.get("ts"):
-        parser_engine.parse_evtx(logs["ts"], "RemoteConnectionManager")
-
-    if logs.get("lsm"):
-        parser_engine.parse_evtx(logs["lsm"], "LocalSessionManager")
-
-    # System and TaskScheduler logs support persistence detection
-    if logs.get("system"):
-        parser_engine.parse_evtx(logs["system"], "System")
-
-    if logs.get("tasks"):
-        parser_engine.parse_evtx(logs["tasks"], "TaskScheduler")
-
-    events = parser_engine.get_events()
-
-    
+    if len(jobs) == 1:
+        # Single log: stream events straight into the timeline
+        parser_engine = RDPEventParser(verbose=verbose)
+        sources = [parser_engine.iter_events(path, name) for path, name in jobs]
+    else:
+        # Multiple logs: parse each file in its own worker process.
+        # Results are collected in submission order so the timeline's
+        # stable sort stays deterministic for identical timestamps.
+        workers = min(len(jobs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futures = [
+                ex.submit(_parse_one, path, name, verbose) for path, name in jobs
+            ]
+            sources = [_reintern(f.result()) for f in futures]
+
+    # Build a global time-ordered event timeline while parsing
+    print("\n[+] Building Timeline...")
+    timeline_builder = RDPTimelineBuilder(sources, verbose=verbose)
+    events = timeline_builder.build_timeline()
 
     print(f"\n[+] TOTAL DFIR Events Extracted: {len(events)}")
 
-    # Build a global time-ordered event timeline
-    print("\n[+] Building Timeline...")
-    timeline_builder = RDPTimelineBuilder(events)
-    timeline_builder.build_timeline()
-
     # Reconstruct RDP sessions using DFIR semantics
     print("\n[+] Building RDP Sessions...")
     sessions = timeline_builder.build_sessions()
@@ -1,5 +1,13 @@
 import datetime
 
+# Benign scheduled task markers, lowercased once for matching
+KNOWN_SAFE_TASKS = tuple(k.lower() for k in (
+    "\\Microsoft\\Windows\\", "Office", "Defrag",
+    "Idle Maintenance", "WindowsUpdate",
+    "Time Synchronization", "Customer Experience",
+    "Servicing", "Telemetry"
+))
+
 
 class DFIRRuleEngine:
 
@@ -170,14 +178,8 @@ class DFIRRuleEngine:
                         continue
                     session_seen["tasks"].add(task_name)
 
-                    KNOWN_SAFE = [
-                        "\\Microsoft\\Windows\\", "Office", "Defrag",
-                        "Idle Maintenance", "WindowsUpdate",
-                        "Time Synchronization", "Customer Experience",
-                        "Servicing", "Telemetry"
-                    ]
-
-                    if any(k.lower() in task_name.lower() for k in KNOWN_SAFE):
+                    task_lower = task_name.lower()
+                    if any(k in task_lower for k in KNOWN_SAFE_TASKS):
                         continue
 
                     self._add_finding(
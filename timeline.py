@@ -1,4 +1,7 @@
 import datetime
+from itertools import chain
+
+import numpy as np
 
 # Temporal correlation windows to account for async Windows logging
 GRACE_BEFORE = datetime.timedelta(minutes=5)
@@ -7,80 +10,153 @@ GRACE_AFTER  = datetime.timedelta(minutes=15)
 # Used only when no explicit disconnect/logoff is observed
 INACTIVITY_TIMEOUT = datetime.timedelta(minutes=60)
 
+# DFIR events correlated temporally to sessions using grace windows
+DFIR_IDS = [
+    "4720", "4722", "4724", "4728", "4732",
+    "4698", "7045", "1102"
+]
+
 
 class RDPTimelineBuilder:
 
-    def __init__(self, events):
-        self.raw_events = events
+    def __init__(self, sources, verbose=True):
+        # Iterable of per-log event iterables (e.g. RDPEventParser.iter_events)
+        self.sources = sources
+        self.verbose = verbose  # Progress messages (disable for batch runs)
         self.timeline = []
         self.sessions = []
 
+        # Columnar (struct-of-arrays) view of the timeline's hot fields,
+        # aligned index-for-index with self.timeline
+        self.columns = {}
+
+
+    def _clean_timestamp(self, ts):
+        """Normalize a raw SystemTime string for NumPy datetime64 parsing."""
+        if not ts or ts == "N/A":
+            return "NaT"
+
+        # Timestamps are UTC; NumPy rejects explicit timezone suffixes
+        if ts.endswith("Z"):
+            return ts[:-1]
+        return ts
+
 
     def _parse_timestamp(self, ts):
         """Fallback parser for malformed or missing timestamps."""
         try:
-            return datetime.datetime.fromisoformat(ts.replace("Z", "+00:00"))
-        except:
-            return None
+            return np.datetime64(ts, "us")
+        except (ValueError, TypeError):
+            return np.datetime64("NaT")
 
 
     def build_timeline(self):
         """Build a global UTC-sorted event timeline."""
 
-        # Ensure all events have a parsed datetime for sorting
-        for ev in self.raw_events:
-            if not ev.get("parsed_time"):
-                ev["parsed_time"] = self._parse_timestamp(ev.get("timestamp"))
+        # Stream every source into one flat list (per-file lists never exist)
+        events = list(chain.from_iterable(self.sources))
 
-        # Sort events chronologically using UTC time
-        self.timeline = sorted(
-            self.raw_events,
-            key=lambda x: x.get("parsed_time") or datetime.datetime.min
-        )
+        # Batch-parse all timestamps at C level in a single NumPy call
+        clean = self._clean_timestamp
+        raw = [clean(ev.get("timestamp")) for ev in events]
+        try:
+            times = np.array(raw, dtype="datetime64[us]")
+        except ValueError:
+            # At least one malformed timestamp: parse individually
+            times = np.array(
+                [self._parse_timestamp(ts) for ts in raw],
+                dtype="datetime64[us]"
+            )
+
+        # UTC datetimes for analysis; unparseable times become None.
+        # datetime64 carries no zone, so UTC is attached after conversion.
+        parsed = [
+            t.replace(tzinfo=datetime.timezone.utc) if t is not None else None
+            for t in times.astype(object)
+        ]
 
-        print(f"[+] Timeline built with {len(self.timeline)} events")
+        # Sort events chronologically on the raw int64 microseconds.
+        # NaT is the minimum int64, so events without a time sort first.
+        order = np.argsort(times.view("i8"), kind="stable")
+
+        self.timeline = []
+        for i in order:
+            ev = events[i]
+            ev["parsed_time"] = parsed[i]
+            self.timeline.append(ev)
+
+        # Fields used by vectorized session logic as parallel arrays.
+        # event_id is an object array so it references the parser's
+        # interned strings instead of copying them into a <U array.
+        self.columns = {
+            "parsed_time": times[order],
+            "event_id": np.array(
+                [ev.get("event_id") for ev in self.timeline], dtype=object
+            )
+        }
+
+        if self.verbose:
+            print(f"[+] Timeline built with {len(self.timeline)} events")
         return self.timeline
 
 
+    def _extract_identity(self, details):
+        """Best-effort (user, source IP) extraction across log sources."""
+
+        user = (
+            details.get("TargetUserName")
+            or details.get("SubjectUserName")
+            or details.get("User")
+            or details.get("AccountName")
+            or details.get("Param1")
+        )
+
+        ip = (
+            details.get("IpAddress")
+            or details.get("ClientAddress")
+            or details.get("SourceNetworkAddress")
+            or details.get("Address")
+            or details.get("Param3")
+        )
+
+        return user, ip
+
+
     def build_sessions(self):
         """Reconstruct RDP sessions using DFIR-correct semantics."""
 
         current_session = None
         last_event_time = None
 
-        for ev in self.timeline:
-            eid = ev.get("event_id")
-            t = ev.get("parsed_time")
-            details = ev.get("details", {})
+        times = self.columns["parsed_time"]
+        event_ids = self.columns["event_id"]
+        n = len(self.timeline)
 
-            if not t:
-                continue
+        # NaT sorts first, so events with a usable time form a suffix
+        valid = ~np.isnat(times)
+        first = int(np.argmax(valid)) if valid.any() else n
 
-            # Best-effort user extraction across log sources
-            user = (
-                details.get("TargetUserName")
-                or details.get("SubjectUserName")
-                or details.get("User")
-                or details.get("AccountName")
-                or details.get("Param1")
-            )
+        # Vectorized inactivity check: gaps[i] is True when event i follows
+        # a silence longer than INACTIVITY_TIMEOUT
+        timeout = INACTIVITY_TIMEOUT // datetime.timedelta(microseconds=1)
+        gaps = np.zeros(n, dtype=bool)
+        gaps[first + 1:] = np.diff(times[first:].view("i8")) > timeout
 
-            # Best-effort source IP extraction across log sources
-            ip = (
-                details.get("IpAddress")
-                or details.get("ClientAddress")
-                or details.get("SourceNetworkAddress")
-                or details.get("Address")
-                or details.get("Param3")
-            )
+        # Locals avoid repeated attribute lookups in the hot loop
+        timeline = self.timeline
+        gap_list = gaps.tolist()
+
+        for i in range(first, n):
+            ev = timeline[i]
+            eid = ev.get("event_id")
+            t = ev["parsed_time"]
 
             # Close session if long inactivity suggests "silent" termination
-            if current_session and last_event_time:
-                if t - last_event_time > INACTIVITY_TIMEOUT:
-                    current_session["end_time"] = last_event_time
-                    current_session["end_reason"] = "inactivity_timeout"
-                    self.sessions.append(current_session)
-                    current_session = None
+            if current_session and gap_list[i]:
+                current_session["end_time"] = last_event_time
+                current_session["end_reason"] = "inactivity_timeout"
+                self.sessions.append(current_session)
+                current_session = None
 
             last_event_time = t
 
@@ -93,6 +169,9 @@ class RDPTimelineBuilder:
 
                 ev["_correlation"] = "in_session"
 
+                # Identity is only needed at session start
+                user, ip = self._extract_identity(ev.get("details", {}))
+
                 current_session = {
                     "start_time": t,
                     "end_time": None,
@@ -122,34 +201,55 @@ class RDPTimelineBuilder:
             current_session["end_reason"] = "session_open_at_log_end"
             self.sessions.append(current_session)
 
-        print(f"[+] Built {len(self.sessions)} RDP sessions")
+        if self.verbose:
+            print(f"[+] Built {len(self.sessions)} RDP sessions")
 
-        # DFIR events correlated temporally to sessions using grace windows
-        dfir_ids = {
-            "4720", "4722", "4724", "4728", "4732",
-            "4698", "7045", "1102"
-        }
+        if not self.sessions:
+            return self.sessions
 
-        dfir_events = [e for e in self.timeline if e.get("event_id") in dfir_ids]
+        # Grace windows as sorted datetime64 arrays. Sessions are built in
+        # timeline order, so window starts ascend; the running max of window
+        # ends lets a binary search find the first session that has not
+        # ended before t, i.e. the same session a linear scan would pick.
+        # (datetime64 is zone-less: drop the UTC tzinfo before converting)
+        starts = np.array(
+            [(s["start_time"] - GRACE_BEFORE).replace(tzinfo=None) for s in self.sessions],
+            dtype="datetime64[us]"
+        )
+        ends = np.array(
+            [
+                ((s["end_time"] or s["start_time"]) + GRACE_AFTER).replace(tzinfo=None)
+                for s in self.sessions
+            ],
+            dtype="datetime64[us]"
+        )
+        max_ends = np.maximum.accumulate(ends)
 
-        for ev in dfir_events:
-            t = ev.get("parsed_time")
-            if not t:
-                continue
+        # Locate every timed DFIR event's candidate session in one call
+        dfir_idx = np.flatnonzero(np.isin(event_ids, DFIR_IDS) & valid)
+        dfir_times = times[dfir_idx]
+
+        candidates = np.searchsorted(max_ends, dfir_times, side="left")
+        in_range = candidates < len(self.sessions)
+        candidates = np.minimum(candidates, len(self.sessions) - 1)
+
+        matched = (
+            in_range
+            & (starts[candidates] <= dfir_times)
+            & (dfir_times <= ends[candidates])
+        )
 
-            for s in self.sessions:
-                start = s["start_time"] - GRACE_BEFORE
-                end = (s["end_time"] or s["start_time"]) + GRACE_AFTER
+        for i, s_idx in zip(dfir_idx[matched].tolist(), candidates[matched].tolist()):
+            ev = self.timeline[i]
+            s = self.sessions[s_idx]
 
-                if start <= t <= end:
-                    # Explicitly label grace-based correlation
-                    if t < s["start_time"]:
-                        ev["_correlation"] = "grace_before"
-                    else:
-                        ev["_correlation"] = "grace_after"
+            # Explicitly label grace-based correlation
+            if ev["parsed_time"] < s["start_time"]:
+                ev["_correlation"] = "grace_before"
+            else:
+                ev["_correlation"] = "grace_after"
 
-                    s["events"].append(ev)
-                    break
+            s["events"].append(ev)
 
         return self.sessions
 